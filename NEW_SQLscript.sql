@@ -176,13 +176,14 @@ CREATE TABLE product (
   CONSTRAINT fk_prod_salon FOREIGN KEY (salon_id) REFERENCES salon(id) ON DELETE CASCADE
 );
 
-/* Salon gallery photos. */
+/* Salon gallery photos. (salon_id, created_at) index serves the newest-first gallery listing without a filesort. */
 CREATE TABLE salon_image (
   id         INT AUTO_INCREMENT PRIMARY KEY,
   salon_id   INT NOT NULL,
   url        VARCHAR(255) NOT NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX(salon_id, created_at),
   CONSTRAINT fk_si_salon FOREIGN KEY (salon_id) REFERENCES salon(id) ON DELETE CASCADE
 );
 
@@ -206,7 +207,7 @@ CREATE TABLE salon_verify (
   status VARCHAR(9),
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  INDEX(salon_id),
+  INDEX(salon_id, status),                  -- existing DBs: ALTER TABLE salon_verify DROP INDEX salon_id, ADD INDEX salon_id (salon_id, status);
   CONSTRAINT fk_sv_salon FOREIGN KEY (salon_id) REFERENCES salon(id) ON DELETE CASCADE,
   CONSTRAINT fk_sv_admin FOREIGN KEY (admin_id) REFERENCES admins(_id)
 );
@@ -13,19 +13,43 @@ S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME")
 S3_REGION = os.environ.get("AWS_REGION")  # Corrected to match .env
 S3_BASE_URL = os.environ.get("S3_BASE_URL")
 
+# Cache config (Redis when available, in-process otherwise)
+# NOTE: SimpleCache is per process. With several gunicorn workers (WEB_CONCURRENCY > 1)
+# an explicit cache.delete() only clears the worker that handled the write, so the
+# others keep serving the old entry until its timeout (5 min for /categories).
+# Set REDIS_URL wherever write invalidation needs to take effect immediately.
+REDIS_URL = os.environ.get("REDIS_URL")
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+
 # --- ADDED PRINT STATEMENTS ---
 print("--- Loading Flask Config ---")
 print(f"S3_BUCKET_NAME: {S3_BUCKET_NAME}")
 print(f"S3_REGION (from AWS_REGION): {S3_REGION}")
 print(f"S3_BASE_URL: {S3_BASE_URL}")
 print(f"DATABASE_URL_LOADED: {'Yes' if url else 'No'}")
+print(f"CACHE_BACKEND: {'RedisCache' if REDIS_URL else 'SimpleCache'}")
+if not REDIS_URL and WEB_CONCURRENCY > 1:
+    print(f"WARNING: REDIS_URL not set with {WEB_CONCURRENCY} workers; "
+          "cache invalidation is per-worker and cached lists may be stale until they expire")
 print("----------------------------")
 # --- END ---
 
 class Config:
     SQLALCHEMY_DATABASE_URI = url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Reuse connections across requests; pre_ping/recycle drop ones MySQL has timed out
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
 
     S3_BUCKET_NAME = S3_BUCKET_NAME
     S3_REGION = S3_REGION
-    S3_BASE_URL = S3_BASE_URL
\ No newline at end of file
+    S3_BASE_URL = S3_BASE_URL
+
+    CACHE_TYPE = "RedisCache" if REDIS_URL else "SimpleCache"
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_DEFAULT_TIMEOUT = 60
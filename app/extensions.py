@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
+from flask_caching import Cache
 
 db = SQLAlchemy()  
-ma = Marshmallow() 
\ No newline at end of file
+ma = Marshmallow() 
+cache = Cache()
@@ -428,7 +428,7 @@ class SalonImage(Base):
     __tablename__ = 'salon_image'
     __table_args__ = (
         ForeignKeyConstraint(['salon_id'], ['salon.id'], ondelete='CASCADE', name='fk_si_salon'),
-        Index('fk_si_salon', 'salon_id')
+        Index('salon_id', 'salon_id', 'created_at')
     )
 
     id = mapped_column(Integer, primary_key=True)
@@ -456,7 +456,7 @@ class SalonVerify(Base):
         ForeignKeyConstraint(['admin_id'], ['admins._id'], name='fk_sv_admin'),
         ForeignKeyConstraint(['salon_id'], ['salon.id'], ondelete='CASCADE', name='fk_sv_salon'),
         Index('fk_sv_admin', 'admin_id'),
-        Index('salon_id', 'salon_id')
+        Index('salon_id', 'salon_id', 'status')
     )
 
     id = mapped_column(Integer, primary_key=True)
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import select
+from sqlalchemy import select, exists, lambda_stmt
 from sqlalchemy.exc import IntegrityError
 from ..extensions import db
 from ..models import Users, Customers, AuthUser
@@ -9,6 +9,9 @@ import datetime
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
+# Lifetime of issued JWTs
+TOKEN_TTL = datetime.timedelta(hours=1)
+
 # -------------------------------------------------------------------------
 # SIGNUP (Hash + Save)
 # -------------------------------------------------------------------------
@@ -31,8 +34,8 @@ def signup_user():
             }), 400
 
         # --- Check duplicate ---
-        existing = db.session.scalar(select(AuthUser).where(AuthUser.email == email))
-        if existing:
+        email_taken = db.session.scalar(select(exists().where(AuthUser.email == email)))
+        if email_taken:
             return jsonify({
                 "status": "error",
                 "message": "Email already exists"
@@ -64,13 +67,14 @@ def signup_user():
             role=role
         )
         db.session.add(auth_user)
+        user_id = user.id  # read before commit expires the instance
         db.session.commit()
 
         return jsonify({
             "status": "success",
             "message": "User registered successfully",
             "user": {
-                "id": user.id,
+                "id": user_id,
                 "name": name,
                 "email": email,
                 "phone": phone,
@@ -112,8 +116,10 @@ def login_user():
                 "message": "Email and password required"
             }), 400
 
-        # --- Lookup user ---
-        user = db.session.scalar(select(AuthUser).where(AuthUser.email == email))
+        # --- Lookup user (lambda_stmt caches the statement construction per call site) ---
+        user = db.session.scalar(
+            lambda_stmt(lambda: select(AuthUser).where(AuthUser.email == email))
+        )
         if not user or not user.password_hash:
             return jsonify({
                 "status": "error",
@@ -132,7 +138,7 @@ def login_user():
             "user_id": user.id,
             "email": user.email,
             "role": user.role,
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+            "exp": datetime.datetime.now(datetime.timezone.utc) + TOKEN_TTL
         }
         token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
 
@@ -160,7 +166,9 @@ def login_user():
 def get_user_type(user_id):
     try:
         # Step 1: Look up in AuthUser table
-        user = db.session.scalar(select(AuthUser).where(AuthUser.id == user_id))
+        user = db.session.scalar(
+            lambda_stmt(lambda: select(AuthUser).where(AuthUser.id == user_id))
+        )
         if not user:
             return jsonify({
                 "status": "error",
@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from app.extensions import db
 from ..models import Salon, Service
 
@@ -29,32 +30,32 @@ def autocomplete_suggestions():
     suggestions = []
 
     # --- 1. SALONS (with exact city match if provided) ---
-    salon_query = db.session.query(Salon.id, Salon.name)
+    salon_query = select(Salon.id, Salon.name)
     if city_filter:
-        salon_query = salon_query.filter(Salon.city == city_filter)
-    salon_query = salon_query.filter(Salon.name.ilike(search_pattern)) \
+        salon_query = salon_query.where(Salon.city == city_filter)
+    salon_query = salon_query.where(Salon.name.ilike(search_pattern)) \
                              .order_by(Salon.name) \
                              .limit(LIMIT)
     
     salons = [{"id": str(s_id), "name": s_name, "type": "salon"} 
-              for s_id, s_name in salon_query.all()]
+              for s_id, s_name in db.session.execute(salon_query)]
     suggestions.extend(salons)
 
     # --- 2. SERVICES (only from salons in same city if city provided) ---
     needed = LIMIT - len(suggestions)
     if needed > 0:
-        service_query = db.session.query(Service.name)
+        service_query = select(Service.name)
 
         if city_filter:
             # Join Salon to ensure service belongs to salon in that exact city
             service_query = service_query.join(Service.salon) \
-                                         .filter(Salon.city == city_filter)
-        service_query = service_query.filter(Service.name.ilike(search_pattern)) \
+                                         .where(Salon.city == city_filter)
+        service_query = service_query.where(Service.name.ilike(search_pattern)) \
                                      .distinct() \
                                      .order_by(Service.name) \
                                      .limit(needed)
         
-        services = [{"name": row[0], "type": "service"} for row in service_query.all()]
+        services = [{"name": name, "type": "service"} for name in db.session.scalars(service_query)]
         suggestions.extend(services)
 
     return jsonify(suggestions)
@@ -1,11 +1,63 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select, text
+from sqlalchemy import select, exists, text, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.exc import IntegrityError
-from ..extensions import db
+from marshmallow import ValidationError
+from ..extensions import db, ma, cache
 from ..models import Cart, Service, Product, CartItem
+from ..utils.cache_utils import CATEGORIES_CACHE_KEY
 
 cart_bp = Blueprint("cart", __name__, url_prefix="/api/cart")
 
+
+# --- Update payload schemas ---
+# Built once at import; unknown keys raise, so only real columns reach the UPDATE.
+class WholeInt(ma.Int):
+    """
+    Integer field that accepts 30 and "30" (form values arrive as strings) but
+    rejects 25.5 / "25.5" instead of truncating them to 25.
+    """
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, float) and not value.is_integer():
+            raise self.make_error("invalid")
+        return super()._deserialize(value, attr, data, **kwargs)
+
+
+class ServiceUpdateSchema(ma.Schema):
+    name = ma.Str(allow_none=True)
+    price = WholeInt(allow_none=True)
+    duration = WholeInt(allow_none=True)
+    salon_id = WholeInt(allow_none=True)
+
+
+class ProductUpdateSchema(ma.Schema):
+    name = ma.Str(allow_none=True)
+    description = ma.Str(allow_none=True)
+    # No places= here: the full value is passed through and DECIMAL(10,2) rounds it as before
+    price = ma.Decimal(allow_none=True)
+    stock_qty = WholeInt(allow_none=True)
+    salon_id = WholeInt(allow_none=True)
+
+
+service_update_schema = ServiceUpdateSchema()
+product_update_schema = ProductUpdateSchema()
+
+
+def _get_or_create_cart_id(user_id):
+    """
+    Return the user's cart id, creating the cart on first use.
+    Single upsert on uq_cart_user: LAST_INSERT_ID(id) makes MySQL hand back the
+    existing row's id on a duplicate, so there is no SELECT and no race between
+    two concurrent first adds.
+    Trade-off: every add-to-cart for an existing cart is now a write (a no-op
+    update on the duplicate row), and under InnoDB's default auto-increment lock
+    modes each duplicate upsert still consumes a cart.id value, leaving gaps.
+    """
+    stmt = mysql_insert(Cart).values(user_id=user_id).on_duplicate_key_update(
+        id=func.last_insert_id(Cart.id)
+    )
+    return db.session.execute(stmt).lastrowid
+
 # -----------------------------------------------------------------------------
 # POST /api/cart/add-service
 # Purpose:
@@ -32,7 +84,9 @@ def add_service_to_cart():
             }), 400
 
         # --- Ensure service exists ---
-        service = db.session.scalar(select(Service).where(Service.id == service_id))
+        service = db.session.execute(
+            select(Service.price).where(Service.id == service_id)
+        ).first()
         if not service:
             return jsonify({
                 "status": "error",
@@ -40,11 +94,7 @@ def add_service_to_cart():
             }), 404
 
         # --- Create / get user's cart ---
-        cart = db.session.scalar(select(Cart).where(Cart.user_id == user_id))
-        if not cart:
-            cart = Cart(user_id=user_id)
-            db.session.add(cart)
-            db.session.commit()
+        cart_id = _get_or_create_cart_id(user_id)
 
         # --- Insert into cart_item ---
         db.session.execute(
@@ -52,7 +102,7 @@ def add_service_to_cart():
                 INSERT INTO cart_item (cart_id, kind, service_id, qty, price)
                 VALUES (:cart_id, 'service', :service_id, :qty, :price)
             """),
-            {"cart_id": cart.id, "service_id": service_id, "qty": quantity, "price": service.price}
+            {"cart_id": cart_id, "service_id": service_id, "qty": quantity, "price": service.price}
         )
         db.session.commit()
 
@@ -103,19 +153,15 @@ def add_product_to_cart():
             }), 400
 
         # --- Ensure product exists ---
-        product = db.session.scalar(select(Product).where(Product.id == product_id))
-        if not product:
+        product_exists = db.session.scalar(select(exists().where(Product.id == product_id)))
+        if not product_exists:
             return jsonify({
                 "status": "error",
                 "message": f"Product ID {product_id} not found"
             }), 404
 
         # --- Create / get user's cart ---
-        cart = db.session.scalar(select(Cart).where(Cart.user_id == user_id))
-        if not cart:
-            cart = Cart(user_id=user_id)
-            db.session.add(cart)
-            db.session.commit()
+        cart_id = _get_or_create_cart_id(user_id)
 
         # --- Insert into cart_item ---
         db.session.execute(
@@ -123,7 +169,7 @@ def add_product_to_cart():
                 INSERT INTO cart_item (cart_id, kind, product_id, qty, price)
                 VALUES (:cart_id, 'product', :product_id, :qty, :price)
             """),
-            {"cart_id": cart.id, "product_id": product_id, "qty": quantity, "price": price}
+            {"cart_id": cart_id, "product_id": product_id, "qty": quantity, "price": price}
         )
         db.session.commit()
 
@@ -156,18 +202,11 @@ def get_cart_details(user_id):
     Includes both service and product items with joined salon details.
     """
     try:
-        # Step 1: Find user's cart
-        cart = db.session.execute(
-            text("SELECT id FROM cart WHERE user_id = :uid"),
-            {"uid": user_id}
-        ).fetchone()
-
-        if not cart:
-            return jsonify({"status": "error", "message": f"No cart found for user_id {user_id}"}), 404
-
-        # Step 2: Query all cart items with joined data
+        # Single round trip: start from the user's cart and LEFT JOIN its items,
+        # so an empty cart still yields one row (with NULL item columns).
         query = text("""
             SELECT 
+                c.id AS cart_id,
                 ci.id AS item_id,
                 ci.kind AS item_type,
                 ci.qty AS quantity,
@@ -189,20 +228,29 @@ def get_cart_details(user_id):
                 p.salon_id AS product_salon_id,
                 sl2.name AS product_salon_name
 
-            FROM cart_item ci
+            FROM cart c
+            LEFT JOIN cart_item ci ON ci.cart_id = c.id
             LEFT JOIN service s ON ci.service_id = s.id
             LEFT JOIN salon sl1 ON s.salon_id = sl1.id
             LEFT JOIN product p ON ci.product_id = p.id
             LEFT JOIN salon sl2 ON p.salon_id = sl2.id
-            WHERE ci.cart_id = :cart_id
+            WHERE c.user_id = :uid
         """)
 
-        result = db.session.execute(query, {"cart_id": cart.id})
-        items = [dict(row._mapping) for row in result]
+        rows = db.session.execute(query, {"uid": user_id}).mappings().all()
+
+        if not rows:
+            return jsonify({"status": "error", "message": f"No cart found for user_id {user_id}"}), 404
+
+        cart_id = rows[0]["cart_id"]
+        items = [
+            {k: v for k, v in row.items() if k != "cart_id"}
+            for row in rows if row["item_id"] is not None
+        ]
 
         return jsonify({
             "status": "success",
-            "cart_id": cart.id,
+            "cart_id": cart_id,
             "user_id": user_id,
             "total_items": len(items),
             "items": items
@@ -257,6 +305,7 @@ def add_salon_item():
                 {"name": name, "duration": duration, "price": price, "salon_id": salon_id}
             )
             db.session.commit()
+            cache.delete(CATEGORIES_CACHE_KEY)
 
             return jsonify({
                 "status": "success",
@@ -334,43 +383,23 @@ def update_salon_service(service_id):
                 "message": "No valid JSON body found. Ensure Content-Type is application/json."
             }), 400
 
-        # Extract possible fields
-        name = data.get("name")
-        price = data.get("price")
-        duration = data.get("duration")
-        category_id = data.get("category_id")
-        salon_id = data.get("salon_id")
-
-        # --- Check if service exists ---
-        existing = db.session.execute(
-            text("SELECT id FROM service WHERE id = :sid"), {"sid": service_id}
-        ).fetchone()
-
-        if not existing:
+        # --- Validate payload (parse + coerce in one pass) ---
+        try:
+            payload = service_update_schema.load(data)
+        except ValidationError as e:
             return jsonify({
                 "status": "error",
-                "message": f"Service ID {service_id} not found."
-            }), 404
+                "message": "Invalid update fields.",
+                "details": e.messages
+            }), 400
 
-        # --- Build dynamic update query ---
-        fields = []
-        params = {"sid": service_id}
-
-        if name:
-            fields.append("name = :name")
-            params["name"] = name
-        if price is not None:
-            fields.append("price = :price")
-            params["price"] = price
-        if duration is not None:
-            fields.append("duration = :duration")
-            params["duration"] = duration
-        if category_id is not None:
-            fields.append("category_id = :category_id")
-            params["category_id"] = category_id
-        if salon_id is not None:
-            fields.append("salon_id = :salon_id")
-            params["salon_id"] = salon_id
+        # --- Build dynamic update query (column names come from the schema) ---
+        params = {k: v for k, v in payload.items() if v not in (None, "")}
+        fields = [f"{col} = :{col}" for col in params]
+        # Echo the values as the client sent them (the schema coerces, e.g. price -> Decimal)
+        updated_fields = {col: data[col] for col in params}
+        params["sid"] = service_id
+        updated_fields["sid"] = service_id
 
         if not fields:
             return jsonify({
@@ -378,15 +407,23 @@ def update_salon_service(service_id):
                 "message": "No valid update fields provided."
             }), 400
 
-        # Execute query
+        # --- Execute query; a missing service matches no rows, so no separate existence SELECT ---
+        # (the MySQL dialect sets CLIENT.FOUND_ROWS, so rowcount counts matched rows even if unchanged)
         query = text(f"UPDATE service SET {', '.join(fields)} WHERE id = :sid")
-        db.session.execute(query, params)
+        result = db.session.execute(query, params)
+        if result.rowcount == 0:
+            db.session.rollback()
+            return jsonify({
+                "status": "error",
+                "message": f"Service ID {service_id} not found."
+            }), 404
         db.session.commit()
+        cache.delete(CATEGORIES_CACHE_KEY)
 
         return jsonify({
             "status": "success",
             "message": f"Service ID {service_id} updated successfully.",
-            "updated_fields": params
+            "updated_fields": updated_fields
         }), 200
 
     except IntegrityError as e:
@@ -415,43 +452,23 @@ def update_salon_product(product_id):
                 "message": "No valid JSON body found. Ensure Content-Type is application/json."
             }), 400
 
-        # Extract possible fields
-        name = data.get("name")
-        description = data.get("description")
-        price = data.get("price")
-        stock_qty = data.get("stock_qty")
-        salon_id = data.get("salon_id")
-
-        # --- Check if product exists ---
-        existing = db.session.execute(
-            text("SELECT id FROM product WHERE id = :pid"), {"pid": product_id}
-        ).fetchone()
-
-        if not existing:
+        # --- Validate payload (parse + coerce in one pass) ---
+        try:
+            payload = product_update_schema.load(data)
+        except ValidationError as e:
             return jsonify({
                 "status": "error",
-                "message": f"Product ID {product_id} not found."
-            }), 404
+                "message": "Invalid update fields.",
+                "details": e.messages
+            }), 400
 
-        # --- Build dynamic update query ---
-        fields = []
-        params = {"pid": product_id}
-
-        if name:
-            fields.append("name = :name")
-            params["name"] = name
-        if description:
-            fields.append("description = :description")
-            params["description"] = description
-        if price is not None:
-            fields.append("price = :price")
-            params["price"] = price
-        if stock_qty is not None:
-            fields.append("stock_qty = :stock_qty")
-            params["stock_qty"] = stock_qty
-        if salon_id is not None:
-            fields.append("salon_id = :salon_id")
-            params["salon_id"] = salon_id
+        # --- Build dynamic update query (column names come from the schema) ---
+        params = {k: v for k, v in payload.items() if v not in (None, "")}
+        fields = [f"{col} = :{col}" for col in params]
+        # Echo the values as the client sent them (the schema coerces, e.g. price -> Decimal)
+        updated_fields = {col: data[col] for col in params}
+        params["pid"] = product_id
+        updated_fields["pid"] = product_id
 
         if not fields:
             return jsonify({
@@ -459,15 +476,22 @@ def update_salon_product(product_id):
                 "message": "No valid update fields provided."
             }), 400
 
-        # Execute query
+        # --- Execute query; a missing product matches no rows, so no separate existence SELECT ---
+        # (the MySQL dialect sets CLIENT.FOUND_ROWS, so rowcount counts matched rows even if unchanged)
         query = text(f"UPDATE product SET {', '.join(fields)} WHERE id = :pid")
-        db.session.execute(query, params)
+        result = db.session.execute(query, params)
+        if result.rowcount == 0:
+            db.session.rollback()
+            return jsonify({
+                "status": "error",
+                "message": f"Product ID {product_id} not found."
+            }), 404
         db.session.commit()
 
         return jsonify({
             "status": "success",
             "message": f"Product ID {product_id} updated successfully.",
-            "updated_fields": params
+            "updated_fields": updated_fields
         }), 200
 
     except IntegrityError as e:
@@ -497,9 +521,13 @@ def delete_cart_item():
     try:
 
         if kind == "product":
-            cart_item = db.session.query(CartItem).filter_by(cart_id=cart_id, product_id=item_id).first()
+            cart_item = db.session.scalar(
+                select(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id == item_id)
+            )
         elif kind == "service":
-            cart_item = db.session.query(CartItem).filter_by(cart_id=cart_id, service_id=item_id).first()
+            cart_item = db.session.scalar(
+                select(CartItem).where(CartItem.cart_id == cart_id, CartItem.service_id == item_id)
+            )
         else:
             return jsonify({"error": "Invalid kind. Must be 'product' or 'service'"}), 400
 
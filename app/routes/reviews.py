@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import select, exists
 from app.extensions import db
 from ..models import Review, ReviewImage 
 from app.utils.s3_utils import upload_file_to_s3
@@ -18,8 +19,8 @@ def upload_review_image():
             return jsonify({"error": "review_id and image_file are required"}), 400
         
    
-        review = db.session.get(Review, review_id)
-        if not review:
+        review_exists = db.session.scalar(select(exists().where(Review.id == review_id)))
+        if not review_exists:
              return jsonify({"error": "Review not found"}), 404
         
  
@@ -40,15 +41,19 @@ def upload_review_image():
         )
 
         db.session.add(new_image)
+        db.session.flush()  # assigns new_image.id
+
+        # Read the fields before commit expires the instance (avoids a refresh SELECT)
+        image_data = {
+            "id": new_image.id,
+            "review_id": new_image.review_id,
+            "url": new_image.url
+        }
         db.session.commit()
 
         return jsonify({
             "message": "Image uploaded successfully",
-            "image": {
-                "id": new_image.id,
-                "review_id": new_image.review_id,
-                "url": new_image.url
-            }
+            "image": image_data
         }), 201
 
     except Exception as e:
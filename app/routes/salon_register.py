@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request, current_app
-from sqlalchemy import distinct, select
+from sqlalchemy import distinct, select, exists, insert
 from sqlalchemy.exc import IntegrityError
-from app.extensions import db
+from app.extensions import db, cache
 from ..models import Service, Product, Users, Customers, AuthUser, Salon, SalonHours, SalonVerify
 from app.utils.s3_utils import upload_file_to_s3
+from app.utils.cache_utils import CATEGORIES_CACHE_KEY
 import uuid, os
+import secrets
 import bcrypt
 import traceback
 
@@ -54,8 +56,10 @@ def register_salon():
             }), 400
         
         # Check if email already exists
-        existing = db.session.scalar(select(AuthUser).where(AuthUser.email == owner_data["email"]))
-        if existing:
+        email_taken = db.session.scalar(
+            select(exists().where(AuthUser.email == owner_data["email"]))
+        )
+        if email_taken:
             return jsonify({
                 "status": "error",
                 "message": "Email already registered"
@@ -126,6 +130,7 @@ def register_salon():
             "sunday": 7
         }
         
+        hour_rows = []
         for day_name, day_num in day_mapping.items():
             if day_name in hours_data:
                 day_hours = hours_data[day_name]
@@ -137,26 +142,32 @@ def register_salon():
                     # Format: "9AM-6PM" to match your database
                     hours_str = f"{open_time}-{close_time}"
                 
-                salon_hour = SalonHours(
-                    salon_id=salon.id,
-                    weekday=day_num,
-                    hours=hours_str
-                )
-                db.session.add(salon_hour)
+                hour_rows.append({
+                    "salon_id": salon.id,
+                    "weekday": day_num,
+                    "hours": hours_str
+                })
+        
+        # One multi-row INSERT instead of one per day
+        if hour_rows:
+            db.session.execute(insert(SalonHours), hour_rows)
         
         # 4. Create initial services
         # Service table columns: id, salon_id, name, price, duration, is_active, icon_url
+        service_rows = []
         for service_data in services_data:
             if service_data.get("name") and service_data.get("price"):
-                service = Service(
-                    salon_id=salon.id,
-                    name=service_data["name"],
-                    price=float(service_data["price"]),
-                    duration=int(service_data.get("duration", 60)),
-                    is_active="true"  # String "true", not boolean
+                service_rows.append({
+                    "salon_id": salon.id,
+                    "name": service_data["name"],
+                    "price": float(service_data["price"]),
+                    "duration": int(service_data.get("duration", 60)),
+                    "is_active": "true"  # String "true", not boolean
                     # icon_url will be NULL initially
-                )
-                db.session.add(service)
+                })
+        
+        if service_rows:
+            db.session.execute(insert(Service), service_rows)
         
         # 5. Create salon verification entry (pending approval)
         # SalonVerify table: salon_id, status (PENDING/VERIFIED/REJECTED)
@@ -166,14 +177,18 @@ def register_salon():
         )
         db.session.add(salon_verify)
         
+        # Read ids before commit expires the instances (avoids refresh SELECTs)
+        new_salon_id, owner_id = salon.id, user.id
+
         # Commit all changes to database
         db.session.commit()
+        cache.delete(CATEGORIES_CACHE_KEY)
         
         return jsonify({
             "status": "success",
             "message": "Salon registration submitted for verification",
-            "salon_id": salon.id,
-            "owner_id": user.id
+            "salon_id": new_salon_id,
+            "owner_id": owner_id
         }), 201
         
     except IntegrityError as e:
@@ -206,14 +221,11 @@ def add_service():
         is_active = is_active_str.lower() == "true"
         
         icon_file = request.files.get("icon_file")
-        print(icon_file)
         if not name or not salon_id:
             return jsonify({"error": "Service name and salon_id are required"}), 400
 
-        existing = (
-            db.session.query(Service)
-            .filter(Service.name == name, Service.salon_id == salon_id)
-            .first()
+        existing = db.session.scalar(
+            select(exists().where(Service.name == name, Service.salon_id == salon_id))
         )
         if existing:
             return jsonify({"error": "Service already exists"}), 409
@@ -250,6 +262,7 @@ def add_service():
 
         db.session.add(new_service)
         db.session.commit()
+        cache.delete(CATEGORIES_CACHE_KEY)
 
  
 
@@ -288,7 +301,7 @@ def add_product():
         description = data.get("description", "")
         stock_qty = int(data.get("stock_qty", 0))
         is_active = 1 if str(data.get("is_active", "true")).lower() == "true" else 0
-        sku = data.get("sku") or str(uuid.uuid4())[:8]
+        sku = data.get("sku") or secrets.token_hex(4)
         icon_file = request.files.get("image_url")
         image_url = data.get("image_url")
         
@@ -304,7 +317,9 @@ def add_product():
         if not name or not salon_id:
             return jsonify({"error": "Product name and salon_id are required"}), 400
 
-        existing = db.session.query(Product).filter_by(name=name, salon_id=salon_id).first()
+        existing = db.session.scalar(
+            select(exists().where(Product.name == name, Product.salon_id == salon_id))
+        )
         if existing:
             return jsonify({"error": "Product already exists"}), 409
 
@@ -347,12 +362,13 @@ def delete_service(service_id):
     Delete a service by its ID.
     """
     try:
-        service = db.session.query(Service).get(service_id)
+        service = db.session.get(Service, service_id)
         if not service:
             return jsonify({"error": f"Service with id {service_id} not found"}), 404
 
         db.session.delete(service)
         db.session.commit()
+        cache.delete(CATEGORIES_CACHE_KEY)
 
         return jsonify({
             "message": f"Service {service_id} deleted successfully"
@@ -372,7 +388,7 @@ def delete_product(product_id):
     Delete a product by its ID.
     """
     try:
-        product = db.session.query(Product).get(product_id)
+        product = db.session.get(Product, product_id)
         if not product:
             return jsonify({"error": f"Product with id {product_id} not found"}), 404
 
@@ -1,19 +1,24 @@
 from flask import Blueprint, jsonify, request, current_app
-from app.extensions import db
+from app.extensions import db, cache
 # Here is where you call the "TABLES" from models. Models is a file that contains all the tables in "Python" format so we can use sqlalchemy
-from ..models import Salon, Service, SalonVerify, Review, Customers, Product
+from ..models import Salon, Service, SalonVerify, Review, Customers, Product, SalonImage
 from app.utils.s3_utils import upload_file_to_s3
+from app.utils.cache_utils import ok_response_only, CITIES_CACHE_KEY, CATEGORIES_CACHE_KEY
 import uuid
+import base64
 import traceback
+from datetime import datetime
 
 #math functions to calculate coordinate distance 
 from math import radians, sin, cos, sqrt, atan2
 
-from sqlalchemy import func, desc, or_
-from sqlalchemy.orm import joinedload 
+from sqlalchemy import select, func, desc, or_, and_
+from sqlalchemy.orm import selectinload, raiseload
 # Create the Blueprint
 salons_bp = Blueprint("salons", __name__, url_prefix="/api/salons")
 
+EARTH_RADIUS_MILES = 3958.8
+
 
 @salons_bp.route("/test", methods=["GET"])
 def test_connection():
@@ -29,18 +34,20 @@ def test_connection():
 
 
 @salons_bp.route("/cities", methods=["GET"])
+@cache.cached(timeout=300, key_prefix=CITIES_CACHE_KEY, response_filter=ok_response_only)
 def get_cities():
     """
     Fetches a unique list of all cities that have a verified salon.
+    Cached for 5 minutes.
     """
     try:
         # This query now works because 'SalonVerify' is imported
-        city_query = db.session.query(Salon.city)\
-                               .filter(Salon.salon_verify.any(SalonVerify.status == 'VERIFIED'))\
-                               .distinct()\
-                               .order_by(Salon.city)
+        city_query = select(Salon.city)\
+                     .where(Salon.salon_verify.any(SalonVerify.status == 'VERIFIED'))\
+                     .distinct()\
+                     .order_by(Salon.city)
         
-        cities = [row[0] for row in city_query.all()]
+        cities = db.session.scalars(city_query).all()
         
         return jsonify({"cities": cities})
 
@@ -49,30 +56,24 @@ def get_cities():
 
 
 @salons_bp.route("/categories", methods=["GET"])
+@cache.cached(timeout=300, key_prefix=CATEGORIES_CACHE_KEY, response_filter=ok_response_only)
 def get_categories():
     """
     Fetches a list of all distinct services .
+    Cached for 5 minutes; cleared whenever a service is added, renamed or deleted
+    (for every worker only with the Redis backend, see REDIS_URL in config).
     """
     try:
-        if hasattr(Service, 'icon_url'):
-            category_query = db.session.query(
-                Service.name, 
-                Service.icon_url
-            ).distinct().order_by(Service.name)
-
-            categories = [
-                {"name": cat.name, "icon_url": cat.icon_url}
-                for cat in category_query.all()
-            ]
-        else:
-            category_query = db.session.query(
-                Service.name
-            ).distinct().order_by(Service.name)
-            
-            categories = [
-                {"name": row[0], "icon_url": None} 
-                for row in category_query.all()
-            ]
+        # Service.icon_url is part of the model, so no per-request column probing
+        category_query = select(
+            Service.name, 
+            Service.icon_url
+        ).distinct().order_by(Service.name)
+
+        categories = [
+            {"name": cat.name, "icon_url": cat.icon_url}
+            for cat in db.session.execute(category_query)
+        ]
             
         return jsonify({"categories": categories})
 
@@ -92,40 +93,49 @@ def getTopRated():
 
         #search through verified salons 
         salons_query = (
-            db.session.query(
+            select(
                 Salon.id,
-                Salon.name, 
+                Salon.name,
                 Salon.type,
-                Salon.address, 
+                Salon.address,
                 Salon.city,
-                Salon.latitude, 
+                Salon.latitude,
                 Salon.longitude,
-                Salon.phone, 
+                Salon.phone,
                 func.avg(Review.rating).label("avg_rating"),
                 func.count(Review.id).label("total_reviews")
             )
             .join(SalonVerify, SalonVerify.salon_id == Salon.id)
             .outerjoin(Review, Review.salon_id == Salon.id)
-            .filter(SalonVerify.status == "VERIFIED")
+            .where(SalonVerify.status == "VERIFIED")
             .group_by(Salon.id)
             .order_by(desc("avg_rating"), desc("total_reviews"))
         )
 
-        salons = salons_query.all()
+        has_location = user_lat is not None and user_long is not None
+
+        # Without a location the result is just the SQL ordering, so let the
+        # database apply the top-10 cut instead of loading every salon.
+        if not has_location:
+            salons_query = salons_query.limit(10)
+
+        salons = db.session.execute(salons_query).all()
+
+        # user-side term of the haversine formula is the same for every salon
+        user_lat_cos = cos(radians(user_lat)) if has_location else None
 
         salon_list = []
         for salon in salons: 
-            if salon.latitude and salon.longitude and user_lat is not None and user_long is not None: 
+            if has_location and salon.latitude and salon.longitude: 
                 salon_lat = float(salon.latitude)
                 salon_long = float(salon.longitude)
 
                 #calculate the distances from the user to the salons 
-                R = 3958.8                                          # Earth radius in miles
                 dlat = radians(salon_lat - user_lat)
                 dlon = radians(salon_long - user_long)
-                a = sin(dlat / 2) ** 2 + cos(radians(user_lat)) * cos(radians(salon_lat)) * sin(dlon / 2) ** 2
+                a = sin(dlat / 2) ** 2 + user_lat_cos * cos(radians(salon_lat)) * sin(dlon / 2) ** 2
                 c = 2 * atan2(sqrt(a), sqrt(1 - a))
-                distance = R * c
+                distance = EARTH_RADIUS_MILES * c
             else: 
                 distance = None
 
@@ -145,7 +155,7 @@ def getTopRated():
             })
 
         #sorting by distance 
-        if user_lat is not None and user_long is not None: 
+        if has_location: 
             salon_list = [s for s in salon_list if s["distance_miles"] is not None]
             salon_list.sort(key=lambda s: s["distance_miles"])
 
@@ -165,34 +175,34 @@ def getTopGeneric():
     """
     try: 
         salons_query = (
-            db.session.query(
+            select(
                 Salon.id,
-                Salon.name, 
+                Salon.name,
                 Salon.type,
-                Salon.address, 
+                Salon.address,
                 Salon.city,
-                Salon.latitude, 
+                Salon.latitude,
                 Salon.longitude,
-                Salon.phone, 
+                Salon.phone,
                 func.avg(Review.rating).label("avg_rating"),
                 func.count(Review.id).label("total_reviews")
             )
             .join(SalonVerify, SalonVerify.salon_id == Salon.id)
             .outerjoin(Review, Review.salon_id == Salon.id)
-            .filter(SalonVerify.status == "VERIFIED")
+            .where(SalonVerify.status == "VERIFIED")
             .group_by(Salon.id)
             .order_by(desc("avg_rating"), desc("total_reviews"))
-            .limit(10)                                             
+            .limit(10)
         )
 
-        salons = salons_query.all()
+        salons = db.session.execute(salons_query).all()
 
         salons_list = []
         for salon in salons: 
             salons_list.append({
                 "id": salon.id,
-                "name": salon.name, 
-                "type": salon.type, 
+                "name": salon.name,
+                "type": salon.type,
                 "address": salon.address,
                 "city": salon.city,
                 "latitude": float(salon.latitude),
@@ -228,9 +238,30 @@ def search_salons():
         user_lat = request.args.get("lat", type=float)
         user_lon = request.args.get("lon", type=float)
 
+        # --- Per-salon aggregates ---
+        # Review and Service are aggregated separately so joining both to Salon
+        # doesn't multiply rows (reviews x services) before AVG/COUNT run.
+        review_stats = (
+            select(
+                Review.salon_id,
+                func.avg(Review.rating).label("avg_rating"),
+                func.count(Review.id).label("total_reviews")
+            )
+            .group_by(Review.salon_id)
+            .subquery()
+        )
+        service_stats = (
+            select(
+                Service.salon_id,
+                func.avg(Service.price).label("avg_service_price")
+            )
+            .group_by(Service.salon_id)
+            .subquery()
+        )
+
         # --- Base Query: Only VERIFIED salons ---
         query = (
-            db.session.query(
+            select(
                 Salon.id,
                 Salon.name,
                 Salon.type,
@@ -238,21 +269,19 @@ def search_salons():
                 Salon.city,
                 Salon.latitude,
                 Salon.longitude,
-                func.avg(Review.rating).label("avg_rating"),
-                func.count(Review.id).label("total_reviews"),
-                func.avg(Service.price).label("avg_service_price")  # NEW: use avg price from services
+                review_stats.c.avg_rating,
+                func.coalesce(review_stats.c.total_reviews, 0).label("total_reviews"),
+                service_stats.c.avg_service_price  # NEW: use avg price from services
             )
-            .join(SalonVerify, SalonVerify.salon_id == Salon.id)
-            .outerjoin(Review, Review.salon_id == Salon.id)
-            .outerjoin(Service, Service.salon_id == Salon.id)
-            .filter(SalonVerify.status == "VERIFIED")
-            .group_by(Salon.id)
+            .outerjoin(review_stats, review_stats.c.salon_id == Salon.id)
+            .outerjoin(service_stats, service_stats.c.salon_id == Salon.id)
+            .where(Salon.salon_verify.any(SalonVerify.status == "VERIFIED"))
         )
 
         # --- Search keyword (salon name or service) ---
         
         if q:
-            query = query.filter(
+            query = query.where(
                 func.lower(Salon.name).like(f"{q.lower()}%") | func.lower(Salon.type).like(f"{q.lower()}%")
             )
 
@@ -266,33 +295,35 @@ def search_salons():
 
         # --- Location (city) filter ---
         if location:
-            query = query.filter(func.lower(Salon.city) == location.lower())
+            query = query.where(func.lower(Salon.city) == location.lower())
 
         # --- Type filter ---
         if service_type:
-            query = query.filter(func.lower(Salon.type) == service_type.lower())
+            query = query.where(func.lower(Salon.type) == service_type.lower())
 
         # --- Price filter (from services) ---
         if price:
-            query = query.having(func.avg(Service.price) <= price)
+            query = query.where(service_stats.c.avg_service_price <= price)
 
         # --- Rating filter ---
         if min_rating:
-            query = query.having(func.avg(Review.rating) >= min_rating)
+            query = query.where(review_stats.c.avg_rating >= min_rating)
 
-        salons = query.all()
+        salons = db.session.execute(query).all()
         salon_list = []
 
         # --- Distance calculation (if coordinates provided) ---
+        has_location = bool(user_lat and user_lon)
+        user_lat_cos = cos(radians(user_lat)) if has_location else None
         for s in salons:
             distance = None
-            if user_lat and user_lon and s.latitude and s.longitude:
-                R = 3958.8  # Earth radius in miles
-                dlat = radians(float(s.latitude) - user_lat)
+            if has_location and s.latitude and s.longitude:
+                salon_lat = float(s.latitude)
+                dlat = radians(salon_lat - user_lat)
                 dlon = radians(float(s.longitude) - user_lon)
-                a = sin(dlat / 2) ** 2 + cos(radians(user_lat)) * cos(radians(float(s.latitude))) * sin(dlon / 2) ** 2
+                a = sin(dlat / 2) ** 2 + user_lat_cos * cos(radians(salon_lat)) * sin(dlon / 2) ** 2
                 c = 2 * atan2(sqrt(a), sqrt(1 - a))
-                distance = R * c
+                distance = EARTH_RADIUS_MILES * c
 
             # Apply distance filter if requested
             if max_distance and distance and distance > max_distance:
@@ -311,7 +342,7 @@ def search_salons():
             })
 
         # --- Sort by distance if provided ---
-        if user_lat and user_lon:
+        if has_location:
             salon_list.sort(key=lambda x: (x["distance_miles"] if x["distance_miles"] else 9999))
         else:
             salon_list.sort(key=lambda x: (x["avg_rating"] if x["avg_rating"] else 0), reverse=True)
@@ -327,14 +358,16 @@ def search_salons():
 # -----------------------------------------------------------------------------
 
 @salons_bp.route("/details/<int:salon_id>", methods=["GET"])
+@cache.cached(timeout=60, response_filter=ok_response_only)
 def get_salon_details(salon_id):
     """
     Fetch full details for a specific salon.
     Includes basic info, location, contact, and review stats.
+    Cached per salon (keyed on the request path) for 60 seconds.
     """
     try:
-        salon_data = (
-            db.session.query(
+        salon_data = db.session.execute(
+            select(
                 Salon.id,
                 Salon.name,
                 Salon.type,
@@ -350,7 +383,7 @@ def get_salon_details(salon_id):
             )
             .join(SalonVerify, SalonVerify.salon_id == Salon.id)
             .outerjoin(Review, Review.salon_id == Salon.id)
-            .filter(SalonVerify.status == "VERIFIED", Salon.id == salon_id)
+            .where(SalonVerify.status == "VERIFIED", Salon.id == salon_id)
             .group_by(
                 Salon.id,
                 Salon.name,
@@ -362,8 +395,7 @@ def get_salon_details(salon_id):
                 Salon.about,
                 Salon.phone
             )
-            .first()
-        )
+        ).first()
 
         if not salon_data:
             return jsonify({"error": "Salon not found"}), 404
@@ -389,28 +421,87 @@ def get_salon_details(salon_id):
         return jsonify({"error": "Database error", "details": str(e)}), 500
 
 
+def _encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, row_id = raw.rsplit("|", 1)
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def _apply_keyset(stmt, created_col, id_col, cursor, limit):
+    """
+    Resume a newest-first (created_col, id_col) listing strictly after cursor and
+    cap it at limit (1-100), fetching one extra row so _trim_keyset_page can tell
+    whether another page exists. Returns (stmt, clamped limit).
+    Raises ValueError on a malformed cursor.
+    """
+    if cursor:
+        cursor_ts, cursor_id = _decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                created_col < cursor_ts,
+                and_(created_col == cursor_ts, id_col < cursor_id)
+            )
+        )
+    if limit:
+        limit = max(1, min(limit, 100))
+        stmt = stmt.limit(limit + 1)
+    return stmt, limit
+
+
+def _trim_keyset_page(rows, limit, key):
+    """Drop the look-ahead row; returns (rows, next_cursor). key(row) -> (created_at, id)."""
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, _encode_cursor(*key(rows[-1]))
+    return rows, None
+
+
 @salons_bp.route("/details/<int:salon_id>/reviews", methods=["GET"])
 def get_salon_reviews(salon_id):
-
+    """
+    Fetch reviews for a salon, newest first.
+    Optional keyset pagination: ?limit=<n>&cursor=<next_cursor from previous page>.
+    Without limit, all reviews are returned as before.
+    """
     try:
+        limit = request.args.get("limit", type=int)
+        cursor = request.args.get("cursor", type=str)
+
         reviews_query = (
-            db.session.query(
+            select(
                 Review,         
                 Customers.name  
             )
             .join(Customers, Review.customers_id == Customers.id) 
-            .filter(Review.salon_id == salon_id)
-            .options(joinedload(Review.review_image)) 
-            .order_by(Review.created_at.desc())
+            .where(Review.salon_id == salon_id)
+            # images load in one IN query, so the LIMIT applies to reviews, not joined image rows;
+            # any other relationship touched in the loop raises instead of lazy-loading per review
+            .options(selectinload(Review.review_image), raiseload("*"))
+            .order_by(Review.created_at.desc(), Review.id.desc())
         )
 
-        reviews_with_names = reviews_query.all() 
+        # --- Keyset pagination: resume strictly after the (created_at, id) cursor ---
+        try:
+            reviews_query, limit = _apply_keyset(reviews_query, Review.created_at, Review.id, cursor, limit)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        reviews_with_names = db.session.execute(reviews_query).all()
+        reviews_with_names, next_cursor = _trim_keyset_page(
+            reviews_with_names, limit, lambda row: (row[0].created_at, row[0].id)
+        )
 
         if not reviews_with_names:
             return jsonify({
                 "salon_id": salon_id,
                 "reviews_found": 0,
-                "reviews": []
+                "reviews": [],
+                "next_cursor": None
             }), 200
 
         review_list = []
@@ -431,7 +522,8 @@ def get_salon_reviews(salon_id):
         return jsonify({
             "salon_id": salon_id,
             "reviews_found": len(review_list),
-            "reviews": review_list
+            "reviews": review_list,
+            "next_cursor": next_cursor
         })
 
     except Exception as e:
@@ -442,24 +534,23 @@ def get_salon_reviews(salon_id):
 def get_salon_services(salon_id):
     """
     Fetch all services offered by a specific salon.
-    Includes service name, price, duration, and (if available) image/icon.
+    Includes service name, price, duration, and icon.
     """
     try:
-        # Detect existing columns in the Service table
-        service_columns = Service.__table__.columns.keys()
-        has_duration = "duration" in service_columns
-        has_image_url = "image_url" in service_columns
-        has_icon_url = "icon_url" in service_columns
-        has_description = "description" in service_columns
-
-        # --- Query for this salon's services ---
+        # --- Query for this salon's services (columns only, no ORM instances) ---
         service_query = (
-            db.session.query(Service)
-            .filter(Service.salon_id == salon_id)
+            select(
+                Service.id,
+                Service.name,
+                Service.price,
+                Service.duration,
+                Service.icon_url
+            )
+            .where(Service.salon_id == salon_id)
             .order_by(Service.name.asc())
         )
 
-        services = service_query.all()
+        services = db.session.execute(service_query).all()
 
         if not services:
             return jsonify({
@@ -468,28 +559,17 @@ def get_salon_services(salon_id):
                 "services": []
             }), 200
 
-        # --- Build the service list dynamically ---
-        service_list = []
-        for s in services:
-            service_obj = {
+        # --- Build the service list (columns are fixed by the Service model) ---
+        service_list = [
+            {
                 "id": s.id,
                 "name": s.name,
-                "price": float(s.price) if hasattr(s, "price") and s.price else None,
+                "price": float(s.price) if s.price else None,
+                "duration": s.duration,
+                "icon_url": s.icon_url
             }
-
-            if has_duration:
-                service_obj["duration"] = getattr(s, "duration", None)
-
-            if has_description:
-                service_obj["description"] = getattr(s, "description", None)
-
-            if has_image_url:
-                service_obj["image_url"] = getattr(s, "image_url", None)
-
-            if has_icon_url:
-                service_obj["icon_url"] = getattr(s, "icon_url", None)
-
-            service_list.append(service_obj)
+            for s in services
+        ]
 
         return jsonify({
             "salon_id": salon_id,
@@ -507,25 +587,40 @@ def get_salon_gallery(salon_id):
     Fetch all gallery images for a specific salon.
     Uses the SalonImage table.
     Includes image URL and upload timestamps.
+    Optional keyset pagination: ?limit=<n>&cursor=<next_cursor from previous page>,
+    same scheme as the reviews endpoint.
     """
     try:
-        # Import the correct model
-        from app.models import SalonImage
+        limit = request.args.get("limit", type=int)
+        cursor = request.args.get("cursor", type=str)
 
-        # --- Query all salon images ---
+        # --- Query all salon images (plain rows, no ORM objects needed) ---
         images_query = (
-            db.session.query(SalonImage)
-            .filter(SalonImage.salon_id == salon_id)
-            .order_by(SalonImage.created_at.desc())
+            select(
+                SalonImage.id,
+                SalonImage.url,
+                SalonImage.created_at,
+                SalonImage.updated_at
+            )
+            .where(SalonImage.salon_id == salon_id)
+            .order_by(SalonImage.created_at.desc(), SalonImage.id.desc())
         )
 
-        images = images_query.all()
+        # --- Keyset pagination: resume strictly after the (created_at, id) cursor ---
+        try:
+            images_query, limit = _apply_keyset(images_query, SalonImage.created_at, SalonImage.id, cursor, limit)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        images = db.session.execute(images_query).all()
+        images, next_cursor = _trim_keyset_page(images, limit, lambda img: (img.created_at, img.id))
 
         if not images:
             return jsonify({
                 "salon_id": salon_id,
                 "media_found": 0,
-                "gallery": []
+                "gallery": [],
+                "next_cursor": None
             }), 200
 
         # --- Build JSON response ---
@@ -541,7 +636,8 @@ def get_salon_gallery(salon_id):
         return jsonify({
             "salon_id": salon_id,
             "media_found": len(gallery_list),
-            "gallery": gallery_list
+            "gallery": gallery_list,
+            "next_cursor": next_cursor
         })
 
     except Exception as e:
@@ -556,15 +652,23 @@ def get_salon_products(salon_id):
     """
 
     try:
-        from app.models import Product
-
-        # Fetch all products for this salon (ORM-style)
-        products = (
-            db.session.query(Product)
-            .filter(Product.salon_id == salon_id)
+        # Fetch all products for this salon (column rows only, read-only endpoint)
+        products = db.session.execute(
+            select(
+                Product.id,
+                Product.name,
+                Product.description,
+                Product.price,
+                Product.stock_qty,
+                Product.is_active,
+                Product.sku,
+                Product.image_url,
+                Product.created_at,
+                Product.updated_at
+            )
+            .where(Product.salon_id == salon_id)
             .order_by(Product.name.asc())
-            .all()
-        )
+        ).all()
 
         if not products:
             return jsonify({
@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import select
 from app.extensions import db
 from ..models import SalonImage  # Import the SalonImage model
 from app.utils.s3_utils import upload_file_to_s3
@@ -34,15 +35,19 @@ def upload_salon_image():
         )
 
         db.session.add(new_image)
+        db.session.flush()  # assigns new_image.id
+
+        # Read the fields before commit expires the instance (avoids a refresh SELECT)
+        image_data = {
+            "id": new_image.id,
+            "salon_id": new_image.salon_id,
+            "url": new_image.url
+        }
         db.session.commit()
 
         return jsonify({
             "message": "Image uploaded successfully",
-            "image": {
-                "id": new_image.id,
-                "salon_id": new_image.salon_id,
-                "url": new_image.url
-            }
+            "image": image_data
         }), 201
 
     except Exception as e:
@@ -53,12 +58,11 @@ def upload_salon_image():
 def get_salon_images(salon_id):
     
     try:
-        images = (
-            db.session.query(SalonImage)
-            .filter(SalonImage.salon_id == salon_id)
-            .order_by(SalonImage.created_at.desc()) 
-            .all()
-        )
+        images = db.session.execute(
+            select(SalonImage.id, SalonImage.url, SalonImage.created_at)
+            .where(SalonImage.salon_id == salon_id)
+            .order_by(SalonImage.created_at.desc())
+        ).all()
 
         if not images:
             return jsonify({
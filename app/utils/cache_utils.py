@@ -0,0 +1,12 @@
+def ok_response_only(rv):
+    """
+    response_filter for @cache.cached: only keep 200 responses so a 404 or a
+    transient DB error is never served from cache.
+    """
+    status = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return status == 200
+
+
+# Explicit keys for cached views that writes need to invalidate
+CITIES_CACHE_KEY = "salons:cities"
+CATEGORIES_CACHE_KEY = "salons:categories"
@@ -0,0 +1,25 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    App-wide JSON provider (app.json) so every jsonify() / dict return is
+    encoded and request bodies are parsed by orjson.
+    Output matches Flask's default provider: datetimes go through Flask's
+    HTTP-date handling (OPT_PASSTHROUGH_DATETIME), Decimal/UUID become strings
+    and keys are sorted (sort_keys is inherited as True).
+    Parsing differs: loads() ignores any json.loads kwargs, and orjson rejects
+    NaN/Infinity literals that the stdlib parser accepted (those bodies now 400).
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
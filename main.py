@@ -17,7 +17,8 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 load_dotenv()   # only needed locally. 
 from app.config import Config
-from app.extensions import db
+from app.extensions import db, cache
+from app.utils.json_utils import ORJSONProvider
 
 # --- Import Blueprints ---
 from app.routes.salons import salons_bp
@@ -37,6 +38,9 @@ def create_app():
         app.config.from_object(Config)
         print("Config loaded successfully")
         print(f"Config items: {len(app.config)} items loaded")
+
+        # orjson-backed jsonify() / request.get_json()
+        app.json = ORJSONProvider(app)
            
         print("Initializing CORS...")
         CORS(app)
@@ -45,6 +49,10 @@ def create_app():
         print("Initializing database...")
         db.init_app(app)
         print("Database initialized")
+
+        print("Initializing cache...")
+        cache.init_app(app)
+        print(f"Cache initialized ({app.config['CACHE_TYPE']})")
            
         print("Registering blueprints...")
         print(f"Salons blueprint: {salons_bp}")
@@ -65,7 +73,6 @@ def create_app():
         @app.route('/')
         def home():
             try:
-                print("Root route accessed")
                 return {"status": "ok", "message": "Backend is running!"}, 200
             except Exception as e:
                 print(f"Error in root route: {e}")